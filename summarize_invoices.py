@@ -2,33 +2,120 @@
 import os
 import re
 import argparse
+from dataclasses import dataclass
+from bisect import bisect_right
 import subprocess
 import sys
 import tempfile
+import threading
 import shutil
-from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
-
-# Updated data structure to hold a more detailed analysis
-InvoiceData = namedtuple('InvoiceData', ['total', 'notes', 'status', 'positive_amounts', 'discounts'])
+import math
+import mmap
+
+try:
+    # Optional: google-re2 scans in linear time without backtracking
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+@dataclass(slots=True)
+class InvoiceData:
+    """Analysis result for one invoice; the extracted amounts are only kept when interaction needs them."""
+    total: float | None
+    notes: str
+    status: str
+    positive_amounts: list[float] | None = None
+    discounts: list[float] | None = None
 
 STATUS_OK = 'OK'
 STATUS_APPLIED_DISCOUNT = 'APPLIED_DISCOUNT'
 STATUS_NEEDS_INTERACTION = 'NEEDS_INTERACTION'
 STATUS_NO_AMOUNT = 'NO_AMOUNT'
 
-def detect_and_handle_duplicates(text_dir, pdf_dir):
+# Whitespace between sign, currency and number; besides ASCII whitespace this covers the UTF-8
+# no-break, typographic and narrow no-break spaces (U+00A0, U+2000-U+200A, U+202F) pdftotext emits
+_SPACE = rb'(?:\s|\xc2\xa0|\xe2\x80[\x80-\x8a\xaf])*'
+_CURRENCY = rb'(?:\xe2\x82\xac|(?i:EUR))'
+_NUMBER = rb'(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))'
+
+# Amounts must be directly preceded or followed by a currency indicator (€ or EUR); a leading '-' marks a discount.
+# The pattern works on raw UTF-8 bytes so the text never has to be decoded.
+_AMOUNT_PATTERN = (
+    rb'(-' + _SPACE + rb')?'
+    rb'(?:'
+    + _CURRENCY + _SPACE + _NUMBER +
+    rb'|'
+    + _NUMBER + _SPACE + _CURRENCY +
+    rb')')
+if _regex is re:
+    _AMOUNT_RE = re.compile(_AMOUNT_PATTERN)
+else:
+    # re2 reads patterns as UTF-8 by default, which would turn the byte escapes above into code points;
+    # Latin-1 maps every byte to itself so they match the raw UTF-8 bytes of the text
+    _re2_options = _regex.Options()
+    _re2_options.encoding = _regex.Options.Encoding.LATIN1
+    _AMOUNT_RE = _regex.compile(_AMOUNT_PATTERN, _re2_options)
+
+# Turns the decimal comma into a point; thousands separators ('.') are deleted by the same translate call
+_NUMBER_TRANSLATION = bytes.maketrans(b',', b'.')
+
+def hash_file(path):
+    """Returns a BLAKE2b hash object fed with a file's contents."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        try:
+            # Hash straight from the page cache without copying the file into memory
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+        except (OSError, ValueError):
+            # Empty files cannot be mapped, and some file systems do not support mmap
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(chunk)
+    return hasher
+
+def open_pdfs(pdf_paths):
+    """Opens PDFs in the system viewer in the background, launching as few viewer processes as possible."""
+    if not pdf_paths:
+        return
+    if sys.platform == "win32":
+        # startfile returns immediately, so there is no process to wait for
+        for pdf_path in pdf_paths:
+            try:
+                os.startfile(pdf_path)
+            except Exception as e:
+                print(f"Error opening PDF {pdf_path}: {e}", file=sys.stderr)
+    elif sys.platform.startswith('linux'):
+        # xdg-open only accepts a single file per call
+        for pdf_path in pdf_paths:
+            try:
+                subprocess.Popen(['xdg-open', pdf_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except Exception as e:
+                print(f"Error opening PDF {pdf_path}: {e}", file=sys.stderr)
+    else:
+        # macOS 'open' takes all files at once and shows them in one viewer
+        try:
+            subprocess.Popen(['open', *pdf_paths], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception as e:
+            print(f"Error opening PDFs: {e}", file=sys.stderr)
+
+def detect_and_handle_duplicates(texts, pdf_dir):
     """Detects duplicate invoices based on text content and handles them interactively."""
+    # Texts can only be identical if their lengths match, so only hash within same-length groups
+    # texts is filled in conversion completion order; sort so the deletion menu numbers are stable
+    sizes = {}
+    for filename, content in sorted(texts.items()):
+        sizes.setdefault(len(content), []).append(filename)
+
     hashes = {}
-    for filename in os.listdir(text_dir):
-        if filename.endswith('.txt'):
-            file_path = os.path.join(text_dir, filename)
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                file_hash = hashlib.sha256(content).hexdigest()
-                if file_hash not in hashes:
-                    hashes[file_hash] = []
-                hashes[file_hash].append(filename)
+    for group in sizes.values():
+        if len(group) < 2:
+            continue
+        for filename in group:
+            # Only collisions matter here, not cryptographic strength, so use the faster BLAKE2b
+            file_hash = hashlib.blake2b(texts[filename], digest_size=16).digest()
+            hashes.setdefault(file_hash, []).append(filename)
     
     duplicates_found = False
     for file_hash, filenames in hashes.items():
@@ -41,14 +128,8 @@ def detect_and_handle_duplicates(text_dir, pdf_dir):
                 print(f"  - {f}")
             
             print("Opening the corresponding PDFs for review...")
-            for f in filenames:
-                pdf_path = os.path.join(pdf_dir, os.path.splitext(f)[0] + '.pdf')
-                if os.path.exists(pdf_path):
-                    try:
-                        if sys.platform == "win32": os.startfile(pdf_path)
-                        else: subprocess.Popen(['xdg-open' if sys.platform.startswith('linux') else 'open', pdf_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    except Exception as e:
-                        print(f"Error opening PDF {pdf_path}: {e}", file=sys.stderr)
+            pdfs_to_open = [os.path.join(pdf_dir, os.path.splitext(f)[0] + '.pdf') for f in filenames]
+            open_pdfs([p for p in pdfs_to_open if os.path.exists(p)])
 
             while True:
                 choice = input("Do you want to delete one of these files? [y/n]: ").lower()
@@ -97,37 +178,89 @@ def check_ocrmypdf_installed():
         print("See: https://ocrmypdf.readthedocs.io/en/latest/installation.html", file=sys.stderr)
         sys.exit(1)
 
-def convert_pdfs_to_text(pdf_dir, text_dir):
-    """Converts all PDFs in a directory to text files."""
-    pdf_files = [f for f in os.listdir(pdf_dir) if f.lower().endswith('.pdf')]
+def get_cache_dir():
+    """Returns the directory for cached text conversions, or None if it cannot be created."""
+    cache_root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    cache_dir = os.path.join(cache_root, 'pdf-invoice-summer')
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError as e:
+        print(f"Warning: Cannot use cache directory {cache_dir}: {e}", file=sys.stderr)
+        return None
+    return cache_dir
+
+def convert_pdfs_to_text(pdf_dir, use_cache=True):
+    """Converts all PDFs in a directory to text, reusing cached conversions of unchanged PDFs.
+
+    Returns a dict mapping each text filename ('<name>.txt') to its UTF-8 encoded content.
+    """
+    with os.scandir(pdf_dir) as entries:
+        pdf_files = [e.name for e in entries if e.is_file() and e.name.lower().endswith('.pdf')]
     if not pdf_files:
         print(f"No PDF files found in '{pdf_dir}'.", file=sys.stderr)
         sys.exit(0)
 
     print(f"Found {len(pdf_files)} PDF files. Converting to text...")
-    for filename in pdf_files:
+    cache_dir = get_cache_dir() if use_cache else None
+
+    def convert(filename):
         pdf_path = os.path.join(pdf_dir, filename)
-        txt_filename = os.path.splitext(filename)[0] + '.txt'
-        txt_path = os.path.join(text_dir, txt_filename)
-        try:
-            subprocess.run(['pdftotext', pdf_path, txt_path], check=True, capture_output=True, text=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Failed to convert {filename}: {e.stderr}", file=sys.stderr)
+
+        # Cache entries are keyed by the PDF's content, so renamed or moved PDFs still hit
+        cache_path = None
+        if cache_dir:
+            try:
+                cache_path = os.path.join(cache_dir, hash_file(pdf_path).hexdigest() + '.txt')
+                if os.path.exists(cache_path):
+                    with open(cache_path, 'rb') as f:
+                        return f.read()
+            except OSError as e:
+                # Leave any failure to pdftotext, which reports it like a regular conversion error
+                print(f"Warning: Could not use cache for {filename}: {e}", file=sys.stderr)
+                cache_path = None
+
+        # '-' makes pdftotext write to stdout, so no intermediate text file is needed
+        content = subprocess.run(['pdftotext', pdf_path, '-'], check=True, capture_output=True).stdout
+
+        if cache_path:
+            # Write to a temporary name first so an interrupted run never leaves a partial entry
+            tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                print(f"Warning: Could not cache text for {filename}: {e}", file=sys.stderr)
+        return content
+
+    texts = {}
+    # pdftotext runs as an external process, so threads are enough to keep all cores busy
+    with ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(convert, filename): filename for filename in pdf_files}
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                texts[os.path.splitext(filename)[0] + '.txt'] = future.result()
+            except subprocess.CalledProcessError as e:
+                print(f"Failed to convert {filename}: {e.stderr.decode('utf-8', errors='replace')}", file=sys.stderr)
+            except OSError as e:
+                print(f"Failed to convert {filename}: {e}", file=sys.stderr)
     print("Conversion complete.")
+    return texts
 
-def handle_broken_extraction(text_dir, pdf_dir):
-    """Checks for broken characters in text files and offers to fix with OCR."""
+def handle_broken_extraction(texts, pdf_dir):
+    """Checks for broken characters in the extracted texts and offers to fix them with OCR, updating texts in place."""
     broken_files = []
     # Unicode replacement character ''
     REPLACEMENT_CHAR = "\uFFFD"
-    for filename in os.listdir(text_dir):
-        if not filename.endswith('.txt'):
-            continue
-        file_path = os.path.join(text_dir, filename)
+    for filename, content in texts.items():
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                if REPLACEMENT_CHAR in f.read():
-                    broken_files.append(filename)
+            if REPLACEMENT_CHAR in content.decode('utf-8'):
+                broken_files.append(filename)
         except UnicodeDecodeError:
             # File might not be utf-8, which can also be a sign of a problem
             broken_files.append(filename)
@@ -157,30 +290,39 @@ def handle_broken_extraction(text_dir, pdf_dir):
             print(f"\nCreated directory for OCR'd PDFs: {fixed_dir_path}")
 
             print("Running OCR... This can be slow, please wait.")
-            for i, txt_filename in enumerate(broken_files):
-                pdf_filename = os.path.splitext(txt_filename)[0] + '.pdf'
-                pdf_path = os.path.join(pdf_dir, pdf_filename)
-                ocr_pdf_path = os.path.join(fixed_dir_path, pdf_filename)
-                txt_path = os.path.join(text_dir, txt_filename)
+            # ocrmypdf writes its text to a sidecar file, which only needs to live until it is read back
+            with tempfile.TemporaryDirectory() as sidecar_dir:
+                for i, txt_filename in enumerate(broken_files):
+                    pdf_filename = os.path.splitext(txt_filename)[0] + '.pdf'
+                    pdf_path = os.path.join(pdf_dir, pdf_filename)
+                    ocr_pdf_path = os.path.join(fixed_dir_path, pdf_filename)
+                    txt_path = os.path.join(sidecar_dir, txt_filename)
                 
-                if not os.path.exists(pdf_path):
-                    print(f"  [Skipping] Original PDF not found: {pdf_path}", file=sys.stderr)
-                    continue
+                    if not os.path.exists(pdf_path):
+                        print(f"  [Skipping] Original PDF not found: {pdf_path}", file=sys.stderr)
+                        continue
 
-                print(f"  [{i+1}/{len(broken_files)}] Processing '{pdf_filename}'...")
-                try:
-                    # Using --force-ocr to ensure processing even if text is found
-                    # Using --sidecar to output the text directly, overwriting the bad file
-                    subprocess.run(
-                        ['ocrmypdf', '--force-ocr', pdf_path, ocr_pdf_path, '--sidecar', txt_path],
-                        check=True, capture_output=True, text=True, encoding='utf-8'
-                    )
-                except subprocess.CalledProcessError as e:
-                    print(f"    ERROR on {pdf_filename}: {e.stderr}", file=sys.stderr)
-                except FileNotFoundError:
-                    # This case is handled by check_ocrmypdf_installed, but as a fallback.
-                    print("FATAL: ocrmypdf command not found. Please install it.", file=sys.stderr)
-                    sys.exit(1)
+                    print(f"  [{i+1}/{len(broken_files)}] Processing '{pdf_filename}'...")
+                    try:
+                        # Using --force-ocr to ensure processing even if text is found
+                        # Using --sidecar to output the text directly, which then replaces the bad text
+                        subprocess.run(
+                            ['ocrmypdf', '--force-ocr', pdf_path, ocr_pdf_path, '--sidecar', txt_path],
+                            check=True, capture_output=True, text=True, encoding='utf-8'
+                        )
+                    except subprocess.CalledProcessError as e:
+                        print(f"    ERROR on {pdf_filename}: {e.stderr}", file=sys.stderr)
+                        continue
+                    except FileNotFoundError:
+                        # This case is handled by check_ocrmypdf_installed, but as a fallback.
+                        print("FATAL: ocrmypdf command not found. Please install it.", file=sys.stderr)
+                        sys.exit(1)
+
+                    try:
+                        with open(txt_path, 'rb') as f:
+                            texts[txt_filename] = f.read()
+                    except OSError as e:
+                        print(f"    ERROR on {pdf_filename}: Could not read OCR text, keeping the original text: {e}", file=sys.stderr)
 
             print("\nOCR processing complete.")
             print("The script will now continue with the corrected text files.")
@@ -189,45 +331,60 @@ def handle_broken_extraction(text_dir, pdf_dir):
             print("Skipping OCR. Analysis will proceed with potentially broken text.")
             break
 
-def analyze_invoice_text(content):
-    """Extracts amounts and determines if discounts can be auto-applied or need interaction."""
-    pattern = re.compile(
-        r'(-\s*)?'
-        r'(?:'
-        r'(?:€|EUR)\s*(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))'
-        r'|'
-        r'(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))\s*(?:€|EUR)'
-        r')', re.IGNORECASE)
+def _collect_amount(match, positive_amounts, discounts):
+    """Parses a single amount match and files it as a positive amount or a discount."""
+    sign, num_before, num_after = match.groups()
+    num_str = num_before or num_after
+    cleaned_num_str = num_str.translate(_NUMBER_TRANSLATION, b'.')
+    try:
+        amount = float(cleaned_num_str)
+    except ValueError:
+        return
+    if sign:
+        discounts.append(amount)
+    else:
+        positive_amounts.append(amount)
 
+def analyze_invoice_text(content):
+    """Extracts amounts from UTF-8 encoded invoice text and determines if discounts can be auto-applied or need interaction."""
     positive_amounts, discounts = [], []
-    for match in pattern.finditer(content):
-        sign, num_before, num_after = match.groups()
-        num_str = num_before or num_after
-        cleaned_num_str = num_str.replace('.', '').replace(',', '.')
-        try:
-            amount = float(cleaned_num_str)
-            if sign:
-                discounts.append(amount)
-            else:
-                positive_amounts.append(amount)
-        except ValueError:
-            continue
-
+    for match in _AMOUNT_RE.finditer(content):
+        _collect_amount(match, positive_amounts, discounts)
+    return _resolve_amounts(positive_amounts, discounts)
+
+def analyze_invoice_texts(contents):
+    """Analyzes several UTF-8 encoded invoices with a single regex scan over their joined text."""
+    # None of the pattern's characters match NUL, so no match can span two invoices
+    joined = b'\0'.join(contents)
+    starts = []
+    offset = 0
+    for content in contents:
+        starts.append(offset)
+        offset += len(content) + 1
+
+    positive_amounts = [[] for _ in contents]
+    discounts = [[] for _ in contents]
+    for match in _AMOUNT_RE.finditer(joined):
+        index = bisect_right(starts, match.start()) - 1
+        _collect_amount(match, positive_amounts[index], discounts[index])
+    return [_resolve_amounts(p, d) for p, d in zip(positive_amounts, discounts)]
+
+def _resolve_amounts(positive_amounts, discounts):
+    """Determines the invoice total from its extracted amounts."""
     if not positive_amounts:
-        return InvoiceData(None, "No amount found", STATUS_NO_AMOUNT, [], [])
-
-    positive_amounts.sort(reverse=True)
-    discounts.sort(reverse=True)
+        return InvoiceData(None, "No amount found", STATUS_NO_AMOUNT)
 
+    main_total = max(positive_amounts)
     if not discounts:
-        return InvoiceData(positive_amounts[0], "", STATUS_OK, positive_amounts, discounts)
+        return InvoiceData(main_total, "", STATUS_OK)
 
-    main_total = positive_amounts[0]
+    discounts.sort(reverse=True)
     calculated_total = round(main_total - discounts[0], 2)
 
-    if calculated_total in [round(p, 2) for p in positive_amounts]:
+    rounded_positives = {round(p, 2) for p in positive_amounts}
+    if calculated_total in rounded_positives:
         notes = f"Discounts found: {', '.join([f'-{d:.2f}' for d in discounts])}. Applied -{discounts[0]:.2f}."
-        return InvoiceData(calculated_total, notes, STATUS_APPLIED_DISCOUNT, positive_amounts, discounts)
+        return InvoiceData(calculated_total, notes, STATUS_APPLIED_DISCOUNT)
     else:
         notes = f"Discounts found: {', '.join([f'-{d:.2f}' for d in discounts])}. WARNING: Could not automatically apply."
         return InvoiceData(main_total, notes, STATUS_NEEDS_INTERACTION, positive_amounts, discounts)
@@ -241,19 +398,12 @@ def interactive_discount_resolver(filename, pdf_dir, positive_amounts, discounts
 
     pdf_path = os.path.join(pdf_dir, os.path.splitext(filename)[0] + '.pdf')
     if os.path.exists(pdf_path):
-        try:
-            # Always open the PDF in the background, redirecting output to suppress messages
-            if sys.platform == "win32":
-                os.startfile(pdf_path)
-            else:
-                viewer = 'xdg-open' if sys.platform.startswith('linux') else 'open'
-                subprocess.Popen([viewer, pdf_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except Exception as e:
-            print(f"Error opening PDF: {e}", file=sys.stderr)
+        open_pdfs([pdf_path])
     else:
         print(f"Original PDF not found at {pdf_path}")
 
-    print(f"\nThe highest amount found is: {positive_amounts[0]:.2f} €")
+    highest_amount = max(positive_amounts)
+    print(f"\nThe highest amount found is: {highest_amount:.2f} €")
     print("\nHow would you like to resolve this?")
     print("  [E] Enter the final correct amount manually")
     print("  [S] Skip (use original highest value)")
@@ -277,7 +427,7 @@ def interactive_discount_resolver(filename, pdf_dir, positive_amounts, discounts
                         print("Invalid amount. Please enter a number.")
                 break
             elif choice_str == 'S':
-                final_total = positive_amounts[0]
+                final_total = highest_amount
                 notes = "Skipped discount in interactive mode."
                 break
             
@@ -299,7 +449,7 @@ def interactive_discount_resolver(filename, pdf_dir, positive_amounts, discounts
 
             if selected_discounts_values:
                 total_discount = sum(selected_discounts_values)
-                final_total = round(positive_amounts[0] - total_discount, 2)
+                final_total = round(highest_amount - total_discount, 2)
                 applied_discounts_str = ', '.join([f"{d:.2f}" for d in selected_discounts_values])
                 notes = f"Manually applied discount(s) of {applied_discounts_str}."
                 break
@@ -320,6 +470,8 @@ def main():
     )
     parser.add_argument('directory', nargs='?', default='.',
                         help="Path to the directory containing PDF invoices.\nDefaults to the current directory.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Always re-run pdftotext instead of reusing text cached from previous runs.")
     args = parser.parse_args()
 
     invoice_dir = os.path.abspath(args.directory)
@@ -329,59 +481,52 @@ def main():
 
     check_pdftotext_installed()
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        convert_pdfs_to_text(invoice_dir, temp_dir)
-        handle_broken_extraction(temp_dir, invoice_dir)
-
-        # Step 1: Detect and handle duplicates
-        if detect_and_handle_duplicates(temp_dir, invoice_dir):
-            print("\nDuplicates were found and handled. Please re-run the script for an accurate summary.")
-            sys.exit(0)
-
-        # Step 2: Proceed with analysis if no duplicates were found
-        invoice_files = [f for f in os.listdir(temp_dir) if f.endswith('.txt')]
-        print(f"\nProcessing {len(invoice_files)} invoices...")
-        results = []
-
-        # First pass: Analyze all files
-        for filename in sorted(invoice_files):
-            file_path = os.path.join(temp_dir, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            invoice_data = analyze_invoice_text(content)
-            results.append((filename, invoice_data))
-
-        # Second pass: Handle interactions
-        final_results = []
-        for filename, invoice_data in results:
-            if invoice_data.status == STATUS_NEEDS_INTERACTION:
-                new_total, new_notes = interactive_discount_resolver(
-                    filename, invoice_dir, invoice_data.positive_amounts, invoice_data.discounts
-                )
-                final_results.append({'file': filename, 'total': new_total, 'notes': new_notes})
-            else:
-                final_results.append({'file': filename, 'total': invoice_data.total, 'notes': invoice_data.notes})
-
-        # Final output
-        grand_total = 0
-        invoice_count = len(final_results)
-        print("\n" + "-" * 80)
-        print(f"{'Invoice File':<25} {'Amount (€)':>12} {'Notes'}")
-        print("-" * 80)
-
-        for result in final_results:
-            total = result.get('total')
-            notes = result.get('notes', '')
-            if total is not None:
-                grand_total += total
-                print(f"{result['file']:<25} {total:>12.2f} {notes}")
-            else:
-                print(f"{result['file']:<25} {'Not found':>12} {notes}")
+    texts = convert_pdfs_to_text(invoice_dir, use_cache=not args.no_cache)
+    handle_broken_extraction(texts, invoice_dir)
+
+    # Step 1: Detect and handle duplicates
+    if detect_and_handle_duplicates(texts, invoice_dir):
+        print("\nDuplicates were found and handled. Please re-run the script for an accurate summary.")
+        sys.exit(0)
 
-        print("-" * 80)
-        grand_total_str = f"Grand Total ({invoice_count} items)"
-        print(f"{grand_total_str:<25} {grand_total:>12.2f}")
-        print("-" * 80)
+    # Step 2: Proceed with analysis if no duplicates were found
+    invoice_files = sorted(texts)
+    print(f"\nProcessing {len(invoice_files)} invoices...")
+
+    # First pass: Analyze all files
+    results = list(zip(invoice_files, analyze_invoice_texts([texts[f] for f in invoice_files])))
+
+    # Second pass: Handle interactions
+    final_results = []
+    for filename, invoice_data in results:
+        if invoice_data.status == STATUS_NEEDS_INTERACTION:
+            new_total, new_notes = interactive_discount_resolver(
+                filename, invoice_dir, invoice_data.positive_amounts, invoice_data.discounts
+            )
+            final_results.append({'file': filename, 'total': new_total, 'notes': new_notes})
+        else:
+            final_results.append({'file': filename, 'total': invoice_data.total, 'notes': invoice_data.notes})
+
+    # Final output
+    # fsum keeps the grand total correctly rounded no matter how many amounts are added
+    grand_total = math.fsum(r['total'] for r in final_results if r['total'] is not None)
+    invoice_count = len(final_results)
+    print("\n" + "-" * 80)
+    print(f"{'Invoice File':<25} {'Amount (€)':>12} {'Notes'}")
+    print("-" * 80)
+
+    for result in final_results:
+        total = result['total']
+        notes = result['notes']
+        if total is not None:
+            print(f"{result['file']:<25} {total:>12.2f} {notes}")
+        else:
+            print(f"{result['file']:<25} {'Not found':>12} {notes}")
+
+    print("-" * 80)
+    grand_total_str = f"Grand Total ({invoice_count} items)"
+    print(f"{grand_total_str:<25} {grand_total:>12.2f}")
+    print("-" * 80)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file